@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from enum import Enum
+import asyncio
 import re
 import json
 import openai
@@ -29,6 +30,79 @@ class UserCondition(str, Enum):
     OVERWHELMED = "overwhelmed"
     MOTIVATED = "motivated"
 
+# Conversation history forwarded to the LLM is capped so per-turn latency
+# and token cost stay flat however long a session runs
+_MAX_VOICE_CONTEXT_MESSAGES = 6
+_MAX_CHAT_CONTEXT_INTERACTIONS = 6
+
+# First JSON object embedded in a model response
+_JSON_OBJECT_RE = re.compile(r'\{.*?\}', re.DOTALL)
+
+# Opening message per session type; {current_time} is filled in when used
+_SESSION_STARTERS = {
+    "morning_planning": "Good morning! ☀️ It's {current_time} and time for our morning planning session. How are you feeling today? What's your energy level like?",
+    "post_work_checkin": "Hey there! 👋 You just finished a work block - how did that go? How are you feeling right now?",
+    "transition": "Ready to dive back in? 🎯 How are you feeling after your break? Let's get you set up for your next work session.",
+    "burnout_prevention": "Hold up! 🛑 You've been working hard for several hours now. It's time for a mandatory rest period. I know you might want to keep going, but your brain needs this break. How are you feeling right now?",
+    "evening_reflection": "Time to wind down! 🌙 It's {current_time} and the workday is done. Let's reflect on how today went. What are you most proud of accomplishing today?",
+}
+
+# Recommended session durations (minutes), based on ADHD attention patterns
+_SESSION_TIMING_MAP = {
+    "morning_planning": 10,      # Enough time to plan, not too long to delay starting
+    "post_work_checkin": 5,      # Quick emotional regulation
+    "transition": 3,             # Brief re-engagement
+    "burnout_prevention": 15,    # Longer to ensure real rest
+    "evening_reflection": 8,     # Meaningful reflection without overthinking
+}
+
+# Common abbreviations replaced with full words for better TTS
+_VOICE_REPLACEMENTS = {
+    "etc.": "and so on",
+    "e.g.": "for example",
+    "i.e.": "that is",
+    "vs.": "versus",
+    "&": "and"
+}
+_VOICE_REPLACEMENT_RE = re.compile("|".join(re.escape(abbrev) for abbrev in _VOICE_REPLACEMENTS))
+
+# Longest response (in characters) passed on for speech synthesis
+_VOICE_MAX_CHARS = 300
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Strips markdown emphasis and flattens line breaks in a single pass
+_VOICE_FORMATTING_TABLE = str.maketrans({"*": None, "_": None, "\n": ". "})
+
+# System prompts are module constants so the start of every request is
+# byte-identical, which lets the provider reuse its cached prompt prefix
+_VOICE_SYSTEM_PROMPT = """You are an AI executive function assistant for someone with ADHD.
+
+VOICE MODE GUIDELINES:
+- Keep responses under 50 words when possible
+- Speak naturally and conversationally
+- Use simple, clear language
+- Ask ONE question at a time
+- Be supportive and understanding
+- Help with planning, focus, and emotional regulation
+- If they seem overwhelmed, simplify your approach
+- For work planning, suggest specific time blocks (25, 35, or 45 minutes)
+- Always end with a clear next step or question
+
+This is a voice conversation, so be concise but warm."""
+
+_CHAT_SYSTEM_PROMPT = """You are a helpful ADHD buddy chatting over coffee. Keep it super casual and short.
+
+CHAT STYLE:
+- Keep responses under 2-3 sentences max
+- Talk like a supportive friend, not a formal assistant
+- No bullet points or structured lists
+- Be warm, understanding, but brief
+- Ask ONE simple question to keep the conversation going
+- Use casual language and contractions (you're, let's, I'd, etc.)
+- If they need planning help, suggest ONE thing at a time
+
+Remember: Short, friendly, conversational - like texting a good friend who gets ADHD."""
+
 class AdaptiveAIService:
     """
     Dynamic AI that creates personalized schedules and adapts in real-time.
@@ -63,30 +137,16 @@ class AdaptiveAIService:
         This is what the AI says first when a session begins.
         """
         
-        current_time = datetime.now().strftime('%I:%M %p')
-        
         if hasattr(session_type, 'value'):
             session_type_str = session_type.value
         else:
             session_type_str = str(session_type)
         
-        if session_type_str == "morning_planning":
-            return f"Good morning! ☀️ It's {current_time} and time for our morning planning session. How are you feeling today? What's your energy level like?"
-        
-        elif session_type_str == "post_work_checkin":
-            return f"Hey there! 👋 You just finished a work block - how did that go? How are you feeling right now?"
-        
-        elif session_type_str == "transition":
-            return f"Ready to dive back in? 🎯 How are you feeling after your break? Let's get you set up for your next work session."
-        
-        elif session_type_str == "burnout_prevention":
-            return f"Hold up! 🛑 You've been working hard for several hours now. It's time for a mandatory rest period. I know you might want to keep going, but your brain needs this break. How are you feeling right now?"
-        
-        elif session_type_str == "evening_reflection":
-            return f"Time to wind down! 🌙 It's {current_time} and the workday is done. Let's reflect on how today went. What are you most proud of accomplishing today?"
-        
-        else:
+        starter = _SESSION_STARTERS.get(session_type_str)
+        if starter is None:
             return "Hi! I'm here to help. What's on your mind?"
+        
+        return starter.format(current_time=datetime.now().strftime('%I:%M %p'))
     
     def get_recommended_session_timing(self, session_type) -> int:
         """
@@ -100,15 +160,7 @@ class AdaptiveAIService:
         else:
             session_type_str = str(session_type)
         
-        timing_map = {
-            "morning_planning": 10,      # Enough time to plan, not too long to delay starting
-            "post_work_checkin": 5,      # Quick emotional regulation
-            "transition": 3,             # Brief re-engagement
-            "burnout_prevention": 15,    # Longer to ensure real rest
-            "evening_reflection": 8,     # Meaningful reflection without overthinking
-        }
-        
-        return timing_map.get(session_type_str, 5)  # Default 5 minutes
+        return _SESSION_TIMING_MAP.get(session_type_str, 5)  # Default 5 minutes
     
     async def analyze_morning_session(self, conversation_history: List[Dict]) -> Dict:
         """
@@ -147,7 +199,8 @@ class AdaptiveAIService:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=self.model,
                 messages=[{"role": "user", "content": analysis_prompt}],
                 temperature=0.3  # Lower temperature for more consistent analysis
@@ -253,7 +306,8 @@ class AdaptiveAIService:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=self.model,
                 messages=[{"role": "user", "content": detection_prompt}],
                 temperature=0.2
@@ -358,7 +412,8 @@ class AdaptiveAIService:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=self.model,
                 messages=[{"role": "user", "content": response_prompt}],
                 temperature=0.7,
@@ -437,10 +492,7 @@ class AdaptiveAIService:
         """
         try:
             # Try to extract JSON from the response
-            # Look for JSON pattern in the text
-            import re
-            json_pattern = r'\{.*?\}'
-            match = re.search(json_pattern, analysis_text, re.DOTALL)
+            match = _JSON_OBJECT_RE.search(analysis_text)
             
             if match:
                 return json.loads(match.group())
@@ -489,9 +541,7 @@ class AdaptiveAIService:
         """Parse emotional state detection response"""
         try:
             # Try to extract JSON
-            import re
-            json_pattern = r'\{.*?\}'
-            match = re.search(json_pattern, analysis_text, re.DOTALL)
+            match = _JSON_OBJECT_RE.search(analysis_text)
             
             if match:
                 return json.loads(match.group())
@@ -537,7 +587,8 @@ class AdaptiveAIService:
             messages = self._build_voice_conversation_context(user_input, conversation_context)
             
             # Generate response
-            response = self.client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=self.model,
                 messages=messages,
                 temperature=0.7,  # Slightly higher for more natural conversation
@@ -556,26 +607,13 @@ class AdaptiveAIService:
     def _build_voice_conversation_context(self, user_input: str, conversation_context: List[Dict]) -> List[Dict]:
         """Build conversation context specifically for voice interactions"""
         
-        system_prompt = """You are an AI executive function assistant for someone with ADHD. 
-        
-        VOICE MODE GUIDELINES:
-        - Keep responses under 50 words when possible
-        - Speak naturally and conversationally  
-        - Use simple, clear language
-        - Ask ONE question at a time
-        - Be supportive and understanding
-        - Help with planning, focus, and emotional regulation
-        - If they seem overwhelmed, simplify your approach
-        - For work planning, suggest specific time blocks (25, 35, or 45 minutes)
-        - Always end with a clear next step or question
-        
-        This is a voice conversation, so be concise but warm."""
+        messages = [{"role": "system", "content": _VOICE_SYSTEM_PROMPT}]
         
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add recent conversation context (last 6 messages to keep it manageable)
-        recent_context = conversation_context[-6:] if len(conversation_context) > 6 else conversation_context
+        # Add recent conversation context (last few messages to keep it manageable)
+        recent_context = conversation_context[-_MAX_VOICE_CONTEXT_MESSAGES:]
         
+        # Forward only role/content - extra fields such as timestamps would
+        # change the serialized prefix without affecting the model
         for msg in recent_context:
             if msg["role"] in ["user", "assistant"]:
                 messages.append({
@@ -592,30 +630,31 @@ class AdaptiveAIService:
         """Optimize AI response for natural speech synthesis"""
         
         # Remove markdown and formatting
-        optimized = text.replace("**", "").replace("*", "").replace("_", "")
-        optimized = optimized.replace("\n", ". ")
+        optimized = text.translate(_VOICE_FORMATTING_TABLE)
         
         # Replace common abbreviations with full words for better TTS
-        replacements = {
-            "etc.": "and so on",
-            "e.g.": "for example",
-            "i.e.": "that is",
-            "vs.": "versus",
-            "&": "and"
-        }
-        
-        for abbrev, full in replacements.items():
-            optimized = optimized.replace(abbrev, full)
+        optimized = _VOICE_REPLACEMENT_RE.sub(lambda m: _VOICE_REPLACEMENTS[m.group()], optimized)
         
         # Ensure proper sentence ending
         if optimized and not optimized.endswith(('.', '!', '?')):
             optimized += "."
         
         # Limit length for better voice processing
-        if len(optimized) > 300:
-            # Split at sentence boundaries and take first 2-3 sentences
-            sentences = optimized.split('. ')
-            optimized = '. '.join(sentences[:2]) + '.'
+        if len(optimized) > _VOICE_MAX_CHARS:
+            # Keep as many whole sentences as fit within the limit
+            kept = []
+            length = 0
+            for sentence in _SENTENCE_BOUNDARY_RE.split(optimized):
+                if kept and length + len(sentence) + 1 > _VOICE_MAX_CHARS:
+                    break
+                kept.append(sentence)
+                length += len(sentence) + 1
+            optimized = " ".join(kept)
+            
+            # A single run-on sentence is cut at the last word boundary
+            if len(optimized) > _VOICE_MAX_CHARS:
+                cut = optimized.rfind(" ", 0, _VOICE_MAX_CHARS)
+                optimized = optimized[:cut if cut > 0 else _VOICE_MAX_CHARS].rstrip(",;:") + "."
         
         return optimized.strip()
     
@@ -669,8 +708,9 @@ class AdaptiveAIService:
             # Build conversation context for chat mode
             messages = self._build_chat_conversation_context(user_message, user_context)
             
-            # Generate response (NOT async)
-            response = self.client.chat.completions.create(
+            # Generate response off the event loop (the client is synchronous)
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=self.model,
                 messages=messages,
                 temperature=0.9,  # Higher for more casual, natural conversation
@@ -689,26 +729,14 @@ class AdaptiveAIService:
     def _build_chat_conversation_context(self, user_message: str, user_context: Dict) -> List[Dict]:
         """Build conversation context specifically for chat interactions"""
         
-        system_prompt = """You are a helpful ADHD buddy chatting over coffee. Keep it super casual and short.
-
-CHAT STYLE:
-- Keep responses under 2-3 sentences max
-- Talk like a supportive friend, not a formal assistant  
-- No bullet points or structured lists
-- Be warm, understanding, but brief
-- Ask ONE simple question to keep the conversation going
-- Use casual language and contractions (you're, let's, I'd, etc.)
-- If they need planning help, suggest ONE thing at a time
-
-Remember: Short, friendly, conversational - like texting a good friend who gets ADHD."""
-        
-        messages = [{"role": "system", "content": system_prompt}]
+        messages = [{"role": "system", "content": _CHAT_SYSTEM_PROMPT}]
         
-        # Add conversation history from context
+        # Add conversation history from context (stored newest first)
         recent_conversations = user_context.get("recent_conversations", [])
         
-        # Include last 6 interactions to keep context but not overwhelm
-        for conv in recent_conversations[-6:]:
+        # Include the last few interactions to keep context but not overwhelm,
+        # replayed oldest first so each new turn only appends to the prompt
+        for conv in reversed(recent_conversations[:_MAX_CHAT_CONTEXT_INTERACTIONS]):
             if conv.get("user_message") and conv.get("ai_response"):
                 messages.append({"role": "user", "content": conv["user_message"]})
                 messages.append({"role": "assistant", "content": conv["ai_response"]})
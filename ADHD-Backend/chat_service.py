@@ -1,5 +1,5 @@
 from typing import Dict, Any, Optional, List
-import json
+import orjson
 from datetime import datetime
 from ai_service import ai_service
 from database import SessionLocal
@@ -101,7 +101,7 @@ class ChatService:
                     } for row in recent_chats
                 ],
                 "conversation_mode": "chat",
-                "session_state": json.loads(status_row[0]) if status_row and status_row[0] else {},
+                "session_state": orjson.loads(status_row[0]) if status_row and status_row[0] else {},
                 "conversation_state": status_row[1] if status_row else None,
                 "has_active_conversation": bool(status_row[2]) if status_row else False
             }
@@ -153,7 +153,7 @@ class ChatService:
                 user_id, 
                 user_message, 
                 ai_response,
-                json.dumps({"interaction_type": "chat", "timestamp": datetime.now().isoformat()})
+                orjson.dumps({"interaction_type": "chat", "timestamp": datetime.now().isoformat()}).decode()
             ))
             
             conn.commit()
@@ -167,16 +167,32 @@ class ChatService:
     async def get_chat_history(
         self, 
         user_id: int, 
-        limit: int = 50
+        limit: int = 50,
+        include_metadata: bool = False
     ) -> List[Dict[str, Any]]:
-        """Get chat history for user"""
+        """
+        Get chat history for user
+        
+        Args:
+            user_id: ID of the user
+            limit: Maximum number of interactions to return
+            include_metadata: Also load and decode the per-interaction metadata
+            
+        Returns:
+            List of interactions, newest first
+        """
         
         try:
             conn = sqlite3.connect('./adhd_companion.db')
             cursor = conn.cursor()
             
-            cursor.execute("""
-                SELECT user_message, ai_response, created_at, metadata
+            # Only read the metadata column when the caller actually wants it
+            columns = "user_message, ai_response, created_at"
+            if include_metadata:
+                columns += ", metadata"
+            
+            cursor.execute(f"""
+                SELECT {columns}
                 FROM chat_interactions 
                 WHERE user_id = ? 
                 ORDER BY created_at DESC 
@@ -186,14 +202,18 @@ class ChatService:
             rows = cursor.fetchall()
             conn.close()
             
-            return [
-                {
+            history = []
+            for row in rows:
+                interaction = {
                     "user_message": row[0],
                     "ai_response": row[1],
-                    "timestamp": row[2],
-                    "metadata": json.loads(row[3]) if row[3] else {}
-                } for row in rows
-            ]
+                    "timestamp": row[2]
+                }
+                if include_metadata:
+                    interaction["metadata"] = orjson.loads(row[3]) if row[3] else {}
+                history.append(interaction)
+            
+            return history
             
         except Exception as e:
             print(f"Error getting chat history for user {user_id}: {e}")
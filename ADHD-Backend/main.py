@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List, Optional, Dict
@@ -7,6 +8,7 @@ import os
 from dotenv import load_dotenv
 from datetime import datetime
 from pydantic import BaseModel
+import orjson
 
 # Import our modules
 from database import get_db, create_tables, test_connection
@@ -23,7 +25,9 @@ load_dotenv()
 app = FastAPI(
     title="ADHD Companion API",
     description="Dynamic AI-powered executive function replacement for ADHD individuals - Text-Based Chat Interface",
-    version="3.0.0"
+    version="3.0.0",
+    # orjson serializes response bodies (incl. datetimes) faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -40,6 +44,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Longest chat message accepted; larger bodies are rejected before they
+# reach storage or the LLM prompt
+MAX_CHAT_MESSAGE_CHARS = 4000
+
 # Pydantic models for request/response
 class ChatRequest(BaseModel):
     user_id: Optional[int] = 1
@@ -85,29 +93,32 @@ async def startup_event():
     create_tables()
     print("✅ ADHD Companion API v3.0 with Chat Interface is ready!")
 
+# Root payload never changes, so it is serialized once at import
+ROOT_RESPONSE_BODY = orjson.dumps({
+    "message": "ADHD Companion API v3.0 - Fully Dynamic AI-Driven System with Chat Interface",
+    "status": "healthy",
+    "version": "3.0.0",
+    "features": [
+        "Dynamic AI Conversations for All Decisions",
+        "Real-time Emotional State Detection", 
+        "Fully Adaptive Scheduling (No Hardcoded Values)",
+        "Conversational Work Block Creation",
+        "Dynamic Break Recommendations",
+        "Executive Function Replacement",
+        "💬 Text-Based Chat Interface",
+        "🤖 Context-Aware AI Conversations"
+    ],
+    "system_type": "fully_dynamic_llm_driven_with_chat",
+    "chat_features": {
+        "text_processing": "Real-time AI responses",
+        "conversation_history": "Context-aware conversations",
+        "adhd_optimized": "Structured responses, clear guidance"
+    }
+})
+
 @app.get("/")
 async def root():
-    return {
-        "message": "ADHD Companion API v3.0 - Fully Dynamic AI-Driven System with Chat Interface",
-        "status": "healthy",
-        "version": "3.0.0",
-        "features": [
-            "Dynamic AI Conversations for All Decisions",
-            "Real-time Emotional State Detection", 
-            "Fully Adaptive Scheduling (No Hardcoded Values)",
-            "Conversational Work Block Creation",
-            "Dynamic Break Recommendations",
-            "Executive Function Replacement",
-            "💬 Text-Based Chat Interface",
-            "🤖 Context-Aware AI Conversations"
-        ],
-        "system_type": "fully_dynamic_llm_driven_with_chat",
-        "chat_features": {
-            "text_processing": "Real-time AI responses",
-            "conversation_history": "Context-aware conversations",
-            "adhd_optimized": "Structured responses, clear guidance"
-        }
-    }
+    return Response(content=ROOT_RESPONSE_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health_check(db: Session = Depends(get_db)):
@@ -555,6 +566,13 @@ async def send_chat_message(request: ChatRequest):
                 ai_response="Please provide a message to send."
             )
         
+        if len(request.text) > MAX_CHAT_MESSAGE_CHARS:
+            return ChatResponse(
+                success=False,
+                error=f"Message text exceeds {MAX_CHAT_MESSAGE_CHARS} characters",
+                ai_response="That message is a bit long for me - could you shorten it?"
+            )
+        
         result = await chat_service.send_chat_message(request.user_id, request.text.strip())
         
         return ChatResponse(
@@ -571,10 +589,10 @@ async def send_chat_message(request: ChatRequest):
         )
 
 @app.get("/api/chat/history/{user_id}")
-async def get_chat_history(user_id: int, limit: int = 50):
+async def get_chat_history(user_id: int, limit: int = 50, include_metadata: bool = False):
     """Get chat history for a user"""
     try:
-        history = await chat_service.get_chat_history(user_id, limit)
+        history = await chat_service.get_chat_history(user_id, limit, include_metadata)
         return {
             "success": True,
             "user_id": user_id,
@@ -616,6 +634,8 @@ async def legacy_chat(message: dict):
     try:
         # Use default user ID for legacy endpoint
         DEFAULT_USER_ID = 1
+        if len(message["text"]) > MAX_CHAT_MESSAGE_CHARS:
+            return {"error": f"Message text exceeds {MAX_CHAT_MESSAGE_CHARS} characters"}
         result = await chat_service.send_chat_message(DEFAULT_USER_ID, message["text"])
         return {"response": result.get("ai_response", "No response available")}
     except Exception as e:
@@ -625,4 +645,5 @@ if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
     host = os.environ.get("HOST", "0.0.0.0")
-    uvicorn.run(app, host=host, port=port) 
\ No newline at end of file
+    # loop="auto" picks uvloop when installed (uvicorn[standard]), asyncio otherwise
+    uvicorn.run(app, host=host, port=port, loop="auto") 
\ No newline at end of file
@@ -84,7 +84,8 @@ class DynamicTimerService:
         """
         
         try:
-            response = self.ai_service.client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.ai_service.client.chat.completions.create,
                 model=self.ai_service.model,
                 messages=[{"role": "system", "content": initial_prompt}],
                 temperature=0.7,
@@ -171,7 +172,8 @@ class DynamicTimerService:
         """
         
         try:
-            response = self.ai_service.client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.ai_service.client.chat.completions.create,
                 model=self.ai_service.model,
                 messages=[{"role": "user", "content": dynamic_prompt}],
                 temperature=0.6,
@@ -257,7 +259,8 @@ class DynamicTimerService:
         """
         
         try:
-            response = self.ai_service.client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.ai_service.client.chat.completions.create,
                 model=self.ai_service.model,
                 messages=[{"role": "user", "content": duration_prompt}],
                 temperature=0.6,
@@ -414,7 +417,8 @@ class DynamicTimerService:
         """
         
         try:
-            response = self.ai_service.client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.ai_service.client.chat.completions.create,
                 model=self.ai_service.model,
                 messages=[{"role": "user", "content": adaptation_prompt}],
                 temperature=0.7,
@@ -507,7 +511,8 @@ class DynamicTimerService:
         """
         
         try:
-            response = self.ai_service.client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.ai_service.client.chat.completions.create,
                 model=self.ai_service.model,
                 messages=[{"role": "user", "content": break_prompt}],
                 temperature=0.6,